@@ -27,17 +27,59 @@ __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/circuitpython/CircuitPython_Org_DisplayIO_ScrollBox.git"
 
 import time
+from array import array
+from collections import OrderedDict
 import displayio
 from fontio import BuiltinFont
 import terminalio
 import bitmaptools
-from adafruit_display_text import bitmap_label, wrap_text_to_pixels
+from adafruit_display_text import wrap_text_to_pixels
 from adafruit_displayio_layout.widgets.widget import Widget
 from adafruit_displayio_layout.widgets.control import Control
 from adafruit_displayio_layout.widgets.easing import exponential_easeinout as easing
 
+try:
+    from bisect import bisect_left as _bisect_left, bisect_right as _bisect_right
+except ImportError:  # CircuitPython has no bisect module
+
+    def _bisect_left(values, x):
+        # index of the first item in the sorted values that is >= x
+        low = 0
+        high = len(values)
+        while low < high:
+            mid = (low + high) // 2
+            if values[mid] < x:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _bisect_right(values, x):
+        # index of the first item in the sorted values that is > x
+        low = 0
+        high = len(values)
+        while low < high:
+            mid = (low + high) // 2
+            if x < values[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+
 # ScrollBox is currently limited to "non-bouncy" easing functions
 
+_EASING_TABLE_SIZE = 32  # number of precomputed easing function samples
+_GLYPH_CACHE_SIZE = 128  # number of font glyphs kept by _get_glyph
+_WRAP_CACHE_SIZE = 4  # number of wrapped texts kept by _wrap_text, kept small for RAM
+_LINE_CACHE_SIZE = 16  # number of line bitmaps kept by _render_line
+
+# least recently used entries first, shared by all the ScrollBox instances
+_glyph_cache = OrderedDict()
+_wrap_cache = OrderedDict()
+_line_cache = OrderedDict()
+_font_users = {}  # number of ScrollBox instances using each font
+
 
 class ScrollBox(Widget, Control):
     """
@@ -64,6 +106,9 @@ class ScrollBox(Widget, Control):
      value is used if no value is provided when a scroll is requested
     :param easing_function: the easing function that controls the movement of the scrolling
      (default: exponential_easeinout)
+    :param bool prerender: set to True to render all the text into one tall bitmap up front,
+     so each scrolling step is a single copy. Uses memory proportional to the text length
+     (default: False)
     """
 
     # pylint: disable=too-many-arguments,too-many-locals,too-many-instance-attributes
@@ -85,6 +130,7 @@ class ScrollBox(Widget, Control):
         starting_row=0,
         animation_time=0.2,
         easing_function=easing,
+        prerender=False,
         **kwargs,
     ):
 
@@ -102,28 +148,37 @@ class ScrollBox(Widget, Control):
         self._y_offset = y_offset
 
         self._current_row = starting_row  # the top row that is currently displayed
+        self._batch_depth = 0  # nesting depth of begin_batch calls
+        self._batch_row = starting_row  # the pending top row during a batch
         self.max_row = None  # bottom row
         self._font = font
+        _use_font(font)
         self.animation_time = animation_time
         self.easing_function = easing_function
+        self._frame_interval = 1 / 30  # seconds per animation frame
         self._width = width
         self._height = height
-
-        if isinstance(self._font, BuiltinFont):
-            self._line_spacing_pixels = round(self._font.bitmap.height * line_spacing)
-        else:
-            self._line_spacing_pixels = round(
-                (self._font.ascent + self._font.descent) * line_spacing
-            )
-        self._dirty_rows = []  # placeholder for rows that need to be redrawn
+        self._prerender = prerender
+        self._text_bitmap = None  # all the rendered text, when prerender is set
+        self._line_texts = []  # no lines have been wrapped or rendered yet
+        self._line_bitmaps = []
+        self._anchor_offsets = []
+        self._cached_start = 0
+        self._cached_end = 0
+
+        self._line_spacing = line_spacing
+        self._recompute_font_metrics()
+        self._redraw_window = True  # the whole window needs to be redrawn
 
         # setup the main bitmap, palette and tilegrid and add to the self Widget Group
-        self.bitmap = displayio.Bitmap(width, height, 2)  # two-color bitmap
+        # two-color bitmap, stored as one bit per pixel
+        self.bitmap = displayio.Bitmap(width, height, 2)
         self.palette = displayio.Palette(2)
         self.palette[0] = background_color
         self.palette[1] = color
         if background_transparent:
             self.palette.make_transparent(0)
+        self._bitmap_buffer = _bitmap_buffer(self.bitmap)  # for moving rows directly
         self.tilegrid = displayio.TileGrid(self.bitmap, pixel_shader=self.palette)
         self.append(self.tilegrid)
 
@@ -132,196 +187,400 @@ class ScrollBox(Widget, Control):
         )  # build the
         self.scroll_to_row(row=starting_row, animation_time=0)  # update the scroll box
 
+    def _recompute_font_metrics(self):
+        # font metrics used for placing the lines, computed once per font
+        if isinstance(self._font, BuiltinFont):
+            self._ascent = self._font.bitmap.height
+            self._descent = 0
+        else:
+            self._ascent = self._font.ascent
+            self._descent = self._font.descent
+        self._line_spacing_pixels = round(
+            (self._ascent + self._descent) * self._line_spacing
+        )
+
     def _make_text_list(
         self, text, font, row_start
     ):  # Build data structure for text and its key parameters
 
-        self._reset_dirty_rows()
-        bitmap_fill_region(self.bitmap)  # clear the bitmap
+        self._redraw_window = True  # Reset that all rows need to be redrawn
+        self.bitmap.fill(0)  # clear the bitmap
+        self._text_bitmap = None  # release the old prerendered text before wrapping
 
         # Convert text to lines using wrapping function (self.text_width_max)
-        self.text_list = []  # initialize the blank list
+        text_width = self.bitmap.width - self._x_offset
+        lines = _wrap_text(text, text_width, font)
+        old_texts = self._line_texts
+
+        # The line data is kept in arrays indexed by the line number. The line limits
+        # are sorted, for binary searching the lines in a row range. Blank lines only
+        # take up their row space, they have nothing to draw and are not stored.
+        self._line_texts = []
+        self._tops = array("i")  # y-position of the top row of each line, in pixels
+        self._bottoms = array("i")  # y-position of the bottom of each line's descent
+        line_height = self._ascent + self._descent
+        line_spacing = self._line_spacing_pixels
         row_count = row_start  # The first y-pixel row
-        for line in wrap_text_to_pixels(
-            text, (self.bitmap.width - self._x_offset), font
-        ):
-            self.text_list.append(_TextData(text=line, font=font, row=row_count))
-            row_count = (
-                row_count + self._line_spacing_pixels
-            )  # Increment for next row's top
+        for line in lines:
+            if line.strip():
+                self._line_texts.append(line)
+                self._tops.append(row_count)
+                self._bottoms.append(row_count + line_height)
+            row_count += line_spacing  # Increment for next row's top
         self.max_row = row_count  # maximum limits of the scrolling (0 to _max_row)
-
-    def _reset_dirty_rows(self):
-        self._dirty_rows = [0, self._height]  # Reset that all rows need to be redrawn
+        line_count = len(self._line_texts)
+
+        # The line bitmaps are rendered and released as needed to reduce the amount
+        # of memory required, along with the y-offset of the baseline anchor relative
+        # to the bitmap upper left corner. Leading lines that are unchanged keep their
+        # bitmaps, so appending to the text does not re-render the lines before it.
+        kept = 0
+        common = min(len(old_texts), line_count)
+        while kept < common and old_texts[kept] == self._line_texts[kept]:
+            kept += 1
+        added = [None] * (line_count - kept)
+        self._line_bitmaps = self._line_bitmaps[:kept] + added
+        self._anchor_offsets = self._anchor_offsets[:kept] + added
+
+        # range of lines that may be holding a bitmap
+        self._cached_end = min(self._cached_end, kept)
+        self._cached_start = min(self._cached_start, self._cached_end)
+
+        if self._prerender:
+            self._render_text_bitmap()
+
+    def _render_text_bitmap(self):
+        # Composite every line into one bitmap covering all the scrollable rows
+        self._text_bitmap = displayio.Bitmap(
+            self._width, self.max_row + self._height, 2
+        )
+        for i in range(len(self._line_texts)):
+            line_bitmap = self._line_bitmap(i)
+            if line_bitmap is None:  # this line was empty, so don't draw anything.
+                continue
+            # glyphs taller than the font ascent can reach above the first row, the
+            # rows above the text bitmap are cut off, as in the windowed drawing
+            line_top = self._tops[i] + self._ascent + self._anchor_offsets[i]
+            self._text_bitmap.blit(
+                self._x_offset,
+                max(0, line_top),
+                line_bitmap,
+                y1=max(0, -line_top),
+                skip_index=0,  # the text bitmap starts out as all background
+            )
+            self._line_bitmaps[i] = None  # the line is kept in the text bitmap
+
+    def _line_bitmap(self, i):
+        # The bitmap of line i, rendering it if needed. The bitmap is cropped to the
+        # glyphs of the line, so for fonts other than the BuiltinFont the anchor
+        # offset differs line to line.
+        line_bitmap = self._line_bitmaps[i]
+        if line_bitmap is None:
+            line_bitmap, self._anchor_offsets[i] = _render_line(
+                self._line_texts[i], self._font
+            )
+            self._line_bitmaps[i] = line_bitmap
+        return line_bitmap
 
     def scroll_to_row(self, row=0, animation_time=None):
         """Scroll to a specific row, in pixels.
         :param int row: the row to scroll to, in pixels.
         :param animation_time: the time in seconds to perform the scrolling animation
         """
-        self.scroll(ypixels=row - self._current_row, animation_time=animation_time)
+        self.scroll(ypixels=row - self._start_row(), animation_time=animation_time)
 
     def scroll(self, ypixels=0, animation_time=None):  # scroll this many pixels
         """Scroll a number of ypixels, relative to the current position.""
         :param int ypixels: the number of pixels to scroll, positive scross the text upward
         :param animation_time: the time in seconds to perform the scrolling animation
         """
+        frames = self._animate(ypixels, animation_time)
+        try:
+            # hold off auto_refresh once for the whole animation
+            with _NoAutoRefresh(self._display):
+                for frame_delay in frames:
+                    time.sleep(frame_delay)
+        finally:
+            frames.close()
+
+    async def scroll_async(self, ypixels=0, animation_time=None):
+        """Scroll a number of ypixels, relative to the current position, yielding to
+        other `asyncio` tasks between the animation frames.
+        :param int ypixels: the number of pixels to scroll, positive scrolls the text upward
+        :param animation_time: the time in seconds to perform the scrolling animation
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        # close the animation if the task is cancelled while waiting for a frame
+        frames = self._animate(ypixels, animation_time, hold_per_frame=True)
+        try:
+            for frame_delay in frames:
+                await asyncio.sleep(frame_delay)
+        finally:
+            frames.close()
+
+    def _animate(self, ypixels, animation_time, hold_per_frame=False):
+        # Generator that performs the scrolling animation, yielding the time in seconds
+        # to wait before the next frame. scroll holds auto_refresh off around the whole
+        # animation. With hold_per_frame it is held off only while each frame is drawn,
+        # not across the waits where other tasks (or another ScrollBox on the same
+        # display) may run.
 
         if animation_time is None:
             animation_time = self.animation_time
 
-        start_row = self._current_row  # find the starting row
-
-        if ypixels == 0:
-            pass  # do not adjust the dirty region
-        else:
-            if ypixels > 0:
-                add_dirty_row_min = self._current_row + self.bitmap.height
-                add_dirty_row_max = self._current_row + self.bitmap.height + ypixels
-            elif ypixels < 0:
-                add_dirty_row_min = self._current_row + ypixels
-                add_dirty_row_max = self._current_row
-
-            # Update the total dirty region
-
-            if self._dirty_rows[0] is None:
-                self._dirty_rows[0] = add_dirty_row_min
-            else:
-                self._dirty_rows[0] = min(self._dirty_rows[0], add_dirty_row_min)
-
-            if self._dirty_rows[1] is None:
-                self._dirty_rows[1] = add_dirty_row_max
-            else:
-                self._dirty_rows[1] = max(self._dirty_rows[1], add_dirty_row_max)
-
-        start_time = time.monotonic()  # store the start of the animation
-
-        while True:
-            elapsed_time = time.monotonic() - start_time
-            if elapsed_time < animation_time:  # animate
-                position = (
-                    elapsed_time / animation_time
-                )  # fraction of total movement to perform (0.0 to 1.0)
-                new_row = round(self.easing_function(position) * ypixels) + start_row
-                self._display.auto_refresh = False
-                self._scroll_and_draw(new_row)
-                self._display.auto_refresh = True
-
-            else:  # animation is complete
-                break
+        start_row = self._start_row()  # find the starting row
+        target_row = max(0, min(self.max_row, start_row + ypixels))  # scroll limits
+
+        if self._batch_depth > 0:  # only record the new position, end_batch draws it
+            self._batch_row = target_row
+            return
+
+        # the row of each animation frame, computed before the animation starts,
+        # there are no frames to wait for if the position does not change, including
+        # scrolls past the limits
+        frame_count = 0
+        if target_row != start_row:
+            frame_count = int(animation_time / self._frame_interval)
+        frame_rows = []
+        for i in range(1, frame_count):
+            new_row = start_row + round(self._ease(i / frame_count) * ypixels)
+            frame_rows.append(max(0, min(self.max_row, new_row)))  # scroll limits
+
+        # frames are scheduled from the start of the animation, the schedule does not
+        # drift with the time spent drawing or oversleeping, frame i is drawn at
+        # i * _frame_interval and the final position at the end of the animation
+        frame_interval = self._frame_interval
+        next_frame = time.monotonic()
+
+        hold = _NoAutoRefresh(self._display) if hold_per_frame else None
+        for new_row in frame_rows:
+            next_frame += frame_interval
+            delay = next_frame - time.monotonic()
+            if delay < -frame_interval:
+                continue  # running more than a frame late, drop this frame
+            yield max(0, delay)  # wait for this frame's time
+
+            # only redraw when the position changed
+            if new_row != self._current_row:
+                self._draw_frame(new_row, True, hold)
+
+        if frame_count:
+            delay = next_frame + frame_interval - time.monotonic()
+            if delay > 0:
+                yield delay  # wait for the final frame's time
+
+        # draw the final animation position. The frames were refreshed as they were
+        # drawn, refresh the final position too, in case auto_refresh was already off.
+        self._draw_frame(target_row, bool(frame_rows), hold)
+
+    def _draw_frame(self, new_row, refresh, hold):
+        # draw a frame, holding auto_refresh off with hold if it is given
+        if hold is not None:
+            with hold:
+                self._draw_frame(new_row, refresh, None)
+            return
+        self._scroll_and_draw(new_row)
+        if refresh:
+            # auto_refresh is off, so don't rate limit the refresh
+            self._display.refresh(target_frames_per_second=None)
+
+    def begin_batch(self):
+        """Start a batch of scrolling operations. Until the matching `end_batch`,
+        calls to `scroll` and `scroll_to_row` only record the new position, without
+        animating or drawing. Batches may be nested.
+        """
+        if self._batch_depth == 0:
+            self._batch_row = self._current_row
+        self._batch_depth += 1
 
-        # draw the final animation position
-        self._display.auto_refresh = False
-        self._scroll_and_draw(start_row + ypixels)
-        self._display.auto_refresh = True
+    def end_batch(self):
+        """End a batch of scrolling operations. When the outermost batch ends, the
+        ScrollBox is drawn once at the final position, without animation.
+        """
+        if self._batch_depth == 0:
+            raise RuntimeError("end_batch called without begin_batch")
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+
+        with _NoAutoRefresh(self._display):
+            self._scroll_and_draw(self._batch_row)
+
+    def _start_row(self):
+        # the row that a new scroll starts from, the pending position during a batch
+        if self._batch_depth > 0:
+            return self._batch_row
+        return self._current_row
 
-        self._dirty_rows = [
-            None,
-            None,
-        ]  # Bitmap is updated, there are no more dirty rows.
+    def _ease(self, position):
+        # linear interpolation into the precomputed easing table
+        index = position * (_EASING_TABLE_SIZE - 1)
+        i = int(index)
+        if i >= _EASING_TABLE_SIZE - 1:
+            return self._easing_table[-1]
+        value = self._easing_table[i]
+        return value + (self._easing_table[i + 1] - value) * (index - i)
 
     def _scroll_and_draw(self, new_row):
         # pylint: disable=too-many-branches
 
         # Constrain the row selection to the row limit range
-        if new_row < 0:
-            new_row = 0
-        if new_row > self.max_row:
-            new_row = self.max_row
+        new_row = max(0, min(self.max_row, new_row))
+        bitmap = self.bitmap
+        height = self._height
+        window_bottom = new_row + height
+
+        if self._text_bitmap is not None:
+            # copy the window straight from the prerendered text
+            bitmap.blit(0, 0, self._text_bitmap, y1=new_row, y2=window_bottom)
+            self._current_row = new_row
+            return
+
+        current_row = self._current_row
+        scroll_rows = current_row - new_row
+
+        # Only the rows exposed by this scroll are drawn, the rest of the window is
+        # moved along with the bitmap contents. The window bitmap is one bit per
+        # pixel, so the fills go straight to fill and fill_region.
+        if self._redraw_window or (abs(scroll_rows) >= height):
+            # if the whole window is dirty or scrolling puts us outside the window,
+            # skip scrolling the old contents and clear bitmap.
+            bitmap.fill(0)
+            dirty_row_min = new_row
+            dirty_row_max = window_bottom
+            self._redraw_window = False
+        elif scroll_rows > 0:  # rows exposed at the top
+            self._shift_bitmap_rows(scroll_rows)
+            bitmaptools.fill_region(bitmap, 0, 0, bitmap.width, scroll_rows, 0)
+            dirty_row_min = new_row
+            dirty_row_max = current_row
+        elif scroll_rows < 0:  # rows exposed at the bottom
+            self._shift_bitmap_rows(scroll_rows)
+            bitmaptools.fill_region(
+                bitmap, 0, height + scroll_rows, bitmap.width, height, 0
+            )
+            dirty_row_min = current_row + height
+            dirty_row_max = window_bottom
+        else:
+            return  # nothing moved and nothing needs to be redrawn
 
-        scroll_rows = self._current_row - new_row
+        self._current_row = new_row  # update the current position
 
-        if (
-            abs(scroll_rows) > self.bitmap.height
-        ):  # if scrolling puts us outside the window, clear bitmap.
-            bitmap_fill_region(self.bitmap, xstart=self._x_offset, palette_index=0)
-        else:
-            if scroll_rows > 0:
-                self.bitmap.blit(0, scroll_rows, self.bitmap)
-                bitmap_fill_region(self.bitmap, yend=scroll_rows, palette_index=0)
-
-            elif scroll_rows < 0:
-                self.bitmap.blit(0, 0, self.bitmap, y1=-scroll_rows)
-                bitmap_fill_region(
-                    self.bitmap, ystart=self._height + scroll_rows, palette_index=0
+        # bind the values used in the line loop to locals, saves attribute lookups
+        line_bitmaps = self._line_bitmaps
+        anchor_offsets = self._anchor_offsets
+        tops = self._tops
+        ascent = self._ascent
+        current_row = new_row
+        bitmap_x_target = self._x_offset
+        blit = bitmap.blit
+
+        # determine which lines need to be blitted, all lines within the
+        # update_region range, blit them at the right place
+        start_line = _bisect_left(self._bottoms, dirty_row_min)
+        end_line = _bisect_right(tops, dirty_row_max)
+
+        for i in range(start_line, end_line):
+            line_bitmap = line_bitmaps[i]
+            if line_bitmap is None:
+                line_bitmap = self._line_bitmap(i)
+                if line_bitmap is None:  # the line has no glyphs to draw
+                    continue
+
+            # the top row of this bitmap, from the baseline anchor point
+            line_top = tops[i] + ascent + anchor_offsets[i]
+
+            # calculate which rows from this text line should be copied into the main bitmap
+            min_row_to_blit = max(dirty_row_min, line_top)
+            max_row_to_blit = min(dirty_row_max, line_top + line_bitmap.height)
+
+            # The clamping above keeps both source offsets within the line bitmap,
+            # so the only check needed is that there are rows left to copy.
+            if min_row_to_blit < max_row_to_blit:
+                # offsets into the source bitmap relative to its upper left corner
+                blit(
+                    bitmap_x_target,
+                    min_row_to_blit - current_row,
+                    line_bitmap,
+                    x1=0,
+                    y1=min_row_to_blit - line_top,
+                    y2=max_row_to_blit - line_top,
+                    skip_index=0,  # the rows were cleared, only copy the text pixels
                 )
 
-        self._current_row = new_row  # update the current position
+        self._evict_line_bitmaps(start_line, end_line)
 
-        if (self._dirty_rows[0] is None) or (self._dirty_rows[1] is None):
-            pass  # don't do anything, since no dirty rows are specified
-        else:
-            start_line = 0
-
-            # determine which rows need to be blitted,
-            # all rows within the update_region range, blit them at the right place
-            for i, text_item in enumerate(self.text_list):
-                if (
-                    text_item.bottom >= self._dirty_rows[0]
-                ):  # Found starting line to be drawn
-                    start_line = i
-                    break  # found the first line that should be drawn
-
-            for text_item in self.text_list[
-                start_line:
-            ]:  # iterate through the remaining text lines
-                if text_item.top <= self._dirty_rows[1]:
-                    line_bitmap = text_item.bitmap
-                    if (
-                        line_bitmap is None
-                    ):  # this line was empty, so don't draw anything.
-                        continue
-
-                    anchor_offset = text_item.bitmap_anchor_offset
-                    # pixel y-offset between the baseline anchor point and the top of this bitmap
-
-                    # calculate which rows from this text line should be copied into the main bitmap
-                    min_row_to_blit = max(
-                        self._dirty_rows[0],
-                        text_item.anchor + anchor_offset,
-                        self._current_row,
-                    )
-                    max_row_to_blit = min(
-                        self._dirty_rows[1],
-                        text_item.anchor + line_bitmap.height + anchor_offset,
-                        self._current_row + self._height,
-                    )
-
-                    # calculate the offsets into the target bitmap
-                    bitmap_x_target = self._x_offset
-                    bitmap_y_target = min_row_to_blit - self._current_row
-
-                    # calculate the offsets into the source bitmap relative to the upper left corner
-                    # of the source bitmap
-                    bitmap_x_source = 0
-                    bitmap_y_source1 = (
-                        min_row_to_blit - text_item.anchor - anchor_offset
-                    )
-                    bitmap_y_source2 = (
-                        max_row_to_blit - text_item.anchor - anchor_offset
-                    )
-
-                    if (0 <= bitmap_y_source1 <= text_item.bitmap.height) and (
-                        0 <= bitmap_y_source2 <= text_item.bitmap.height
-                    ):
-
-                        self.bitmap.blit(
-                            bitmap_x_target,
-                            bitmap_y_target,
-                            line_bitmap,
-                            x1=bitmap_x_source,
-                            y1=bitmap_y_source1,
-                            y2=bitmap_y_source2,
-                            skip_index=None,
-                        )
-
-                else:
-                    break  # the top of line is past update region, so must be finished drawing
+    def _shift_bitmap_rows(self, shift):
+        # Move the bitmap contents down by shift rows (up if negative).
+        # When the bitmap exposes its buffer, the rows are moved with memoryview
+        # slice copies, instead of copying the bitmap into itself pixel by pixel.
+        buffer = self._bitmap_buffer
+        if buffer is None:
+            if shift > 0:
+                self.bitmap.blit(0, shift, self.bitmap)
+            else:
+                self.bitmap.blit(0, 0, self.bitmap, y1=-shift)
+            return
+
+        # Copy in chunks of at most `shift` rows, so that the source and destination
+        # of each slice copy never overlap.
+        end = len(buffer)
+        step = abs(shift) * (end // self.bitmap.height)
+        if shift > 0:  # start with the bottom rows
+            stop = end
+            while stop > step:
+                start = max(step, stop - step)
+                buffer[start:stop] = buffer[start - step : stop - step]
+                stop = start
+        else:  # start with the top rows
+            start = 0
+            while start < end - step:
+                stop = min(end - step, start + step)
+                buffer[start:stop] = buffer[start + step : stop + step]
+                start = stop
+        self.bitmap.dirty()
+
+    def _evict_line_bitmaps(self, start_line, end_line):
+        # Release the bitmaps of lines outside the window, so the memory used is
+        # proportional to the window size rather than the text length. Two lines on
+        # each side of the window keep their bitmaps for short back-scrolls.
+        margin = 2 * self._line_spacing_pixels
+        keep_start = _bisect_left(self._bottoms, self._current_row - margin)
+        keep_end = _bisect_right(self._tops, self._current_row + self._height + margin)
+
+        # range of lines that may be holding a bitmap, including the lines just drawn
+        cached_start = min(self._cached_start, start_line)
+        cached_end = max(self._cached_end, end_line)
+
+        line_bitmaps = self._line_bitmaps
+        for i in range(cached_start, min(keep_start, cached_end)):
+            line_bitmaps[i] = None
+        for i in range(max(keep_end, cached_start), cached_end):
+            line_bitmaps[i] = None
+
+        self._cached_start = max(cached_start, keep_start)
+        self._cached_end = min(cached_end, keep_end)
 
     @property
     def current_row(self):
-        """The current top row displayed on the ScrollBox, in pixels."""
-        return self._current_row
+        """The current top row of the ScrollBox, in pixels. During a batch, this is
+        the pending row that `end_batch` will draw."""
+        return self._start_row()
+
+    @property
+    def easing_function(self):
+        """The easing function that controls the movement of the scrolling."""
+        return self._easing_function
+
+    @easing_function.setter
+    def easing_function(self, new_easing_function) -> None:
+        self._easing_function = new_easing_function
+        # sample the easing function once, rather than evaluating it every frame
+        self._easing_table = [
+            new_easing_function(i / (_EASING_TABLE_SIZE - 1))
+            for i in range(_EASING_TABLE_SIZE)
+        ]
 
     @property
     def text(self) -> str:
@@ -330,6 +589,8 @@ class ScrollBox(Widget, Control):
 
     @text.setter
     def text(self, new_text: str) -> None:
+        if new_text == self._text:
+            return  # nothing to rewrap or redraw
         self._text = new_text
         self._make_text_list(text=self._text, font=self._font, row_start=self._y_offset)
         self.scroll_to_row(row=0, animation_time=0)  # update the scroll box
@@ -341,7 +602,13 @@ class ScrollBox(Widget, Control):
 
     @font.setter
     def font(self, new_font) -> None:
+        if new_font is self._font:
+            return  # nothing to rewrap or redraw
+        _release_font(self._font)
+        _use_font(new_font)
         self._font = new_font
+        self._line_texts = []  # the rendered lines are in the old font
+        self._recompute_font_metrics()
         self._make_text_list(text=self._text, font=self._font, row_start=self._y_offset)
         self.scroll_to_row(row=0, animation_time=0)  # update the scroll box
 
@@ -376,61 +643,147 @@ class ScrollBox(Widget, Control):
             self.palette.make_opaque(0)
 
 
-# TextData data structure Class for holding the text line, bitmap and row offset
-# The bitmaps are rendered and destroyed as-needed to reduce the amount of memory required.
-class _TextData:
-    def __init__(
-        self,
-        *,
-        text,
-        font,
-        row,
-    ):
+class _NoAutoRefresh:
+    # Context manager that turns off the display auto_refresh, restoring the
+    # previous setting on exit
+    def __init__(self, display):
+        self._display = display
+        self._auto_refresh = None
 
-        self.text = text
-        self.font = font
+    def __enter__(self):
+        self._auto_refresh = self._display.auto_refresh
+        self._display.auto_refresh = False
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self._display.auto_refresh = self._auto_refresh
+
+
+def _cached(cache, max_size, key, function, *args):
+    # Least recently used cache lookup, calling function(*args) on a cache miss
+    try:
+        value = cache.pop(key)
+    except KeyError:
+        value = function(*args)
+        if len(cache) >= max_size:
+            del cache[next(iter(cache))]  # the least recently used
+    cache[key] = value  # move to the most recently used end
+    return value
+
+
+def _get_glyph(font, code_point):
+    # Fonts keep the glyph bitmaps they have loaded, but looking up a glyph the font
+    # does not have can be costly (bitmap fonts search the font file again), so the
+    # result is cached either way.
+    return _cached(
+        _glyph_cache, _GLYPH_CACHE_SIZE, (font, code_point), font.get_glyph, code_point
+    )
 
-        self.top = row  # y-position in the display for the top row, in pixels
 
-        if isinstance(font, BuiltinFont):
-            ascent = font.bitmap.height
-            descent = 0
-        else:
-            ascent = font.ascent
-            descent = font.descent
-        self.anchor = (
-            row + ascent
-        )  # y-position in the display for the bitmap anchor point
-        self.bottom = row + ascent + descent
-
-        self._bitmap = None
-        self.bitmap_anchor_offset = (
-            None  # the y-offset of the anchor, relative to the bitmap upper left corner
-        )
+def _wrap_text(text, width, font):
+    # The text wrapped into lines, reusing the lines when the same text is set again
+    return _cached(
+        _wrap_cache,
+        _WRAP_CACHE_SIZE,
+        (font, text, width),
+        _wrap_lines,
+        text,
+        width,
+        font,
+    )
 
-    @property
-    def bitmap(self):
-        """Bitmap for the text_line."""
-        if self._bitmap is None:
-            # generate the bitmap_label to capture the bitmap and bitmap_anchor_offset
-            temp_label = bitmap_label.Label(
-                text=self.text,
-                font=self.font,
-                base_alignment=True,
-                background_tight=True,
-            )
 
-            self._bitmap = temp_label.bitmap
-            self.bitmap_anchor_offset = temp_label.bounding_box[
-                1
-            ]  # the bitmap y-offset for the baseline anchor
+def _wrap_lines(text, width, font):
+    return tuple(wrap_text_to_pixels(text, width, font))
+
+
+def _use_font(font):
+    _font_users[font] = _font_users.get(font, 0) + 1
+
+
+def _release_font(font):
+    # Called when a ScrollBox stops using a font, the cache entries of the font are
+    # dropped once no ScrollBox uses it, other ScrollBoxes may share a font such as
+    # the default terminalio.FONT.
+    users = _font_users.pop(font) - 1
+    if users:
+        _font_users[font] = users
+    else:
+        _forget_font(font)
+
+
+def _forget_font(font):
+    # Drop the cached glyphs, wrapped lines and line bitmaps of a font that is no
+    # longer used, so that the caches do not hold on to the font and its bitmaps.
+    for cache in (_glyph_cache, _wrap_cache, _line_cache):
+        for key in [key for key in cache if key[0] is font]:
+            del cache[key]
+
+
+def _render_line(text, font):
+    # The line bitmap and anchor offset from _draw_line, reusing the bitmaps of
+    # recently drawn lines, such as repeated lines or lines scrolled back into view.
+    # The bitmaps are only ever copied from, so they can be shared.
+    if not text:
+        return None, None  # nothing to draw, and not worth a place in the cache
+    return _cached(_line_cache, _LINE_CACHE_SIZE, (font, text), _draw_line, text, font)
+
+
+def _draw_line(text, font):
+    # Copy the glyphs of a line of text into a two-color bitmap, cropped to the glyphs.
+    # Returns the bitmap and the y-offset of its top relative to the baseline, or
+    # (None, None) if there is nothing to draw.
+    glyphs = []
+    x_position = 0
+    left = None
+    right = top = bottom = 0  # the box always includes the baseline
+    for char in text:
+        glyph = _get_glyph(font, ord(char))
+        if glyph is None:  # the font has no glyph for this character
+            continue
+        glyphs.append((x_position, glyph))
+        x_left = x_position + glyph.dx
+        left = x_left if left is None else min(left, x_left)
+        right = max(right, x_position + glyph.shift_x, x_left + glyph.width)
+        top = min(top, -glyph.height - glyph.dy)
+        bottom = max(bottom, -glyph.dy)
+        x_position += glyph.shift_x
+
+    if (left is None) or (right <= left) or (bottom <= top):
+        return None, None
+
+    bitmap = displayio.Bitmap(right - left, bottom - top, 2)
+    for x_position, glyph in glyphs:
+        if glyph.width and glyph.height:
+            # tile_index selects the glyph in the BuiltinFont bitmap, 0 for other fonts
+            glyph_x = glyph.tile_index * glyph.width
+            bitmap.blit(
+                x_position + glyph.dx - left,
+                -glyph.height - glyph.dy - top,
+                glyph.bitmap,
+                x1=glyph_x,
+                y1=0,
+                x2=glyph_x + glyph.width,
+                y2=glyph.height,
+                skip_index=0,
+            )
+    return bitmap, top
 
-        return self._bitmap
 
-    def clear_bitmap(self):
-        """Removes the bitmap data."""
-        self._bitmap = None
-        self.bitmap_anchor_offset = None
+def _bitmap_buffer(bitmap):
+    # A memoryview of the bitmap's buffer of whole rows, or None if the bitmap does
+    # not expose a writable buffer or cannot be marked for refresh after direct writes.
+    try:
+        buffer = memoryview(bitmap)
+    except TypeError:
+        return None
+    if len(buffer) % bitmap.height or not hasattr(bitmap, "dirty"):
+        return None
+    try:
+        buffer[:1] = buffer[:1]  # no-op write, fails on read-only buffers
+    except (TypeError, NotImplementedError):
+        return None
+    return buffer
 
 
 #
@@ -444,6 +797,11 @@ def bitmap_fill_region(
     if yend is None:
         yend = bitmap.height
 
+    if xstart == 0 and ystart == 0 and xend == bitmap.width and yend == bitmap.height:
+        # the whole bitmap, fill fills the packed buffer a word at a time
+        bitmap.fill(palette_index)
+        return
+
     bitmaptools.fill_region(
         bitmap, x1=xstart, y1=ystart, x2=xend, y2=yend, value=palette_index
     )